@@ -1,21 +1,67 @@
+import os
+from types import SimpleNamespace
+
 from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from flask_migrate import Migrate
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from .models import db, ensure_subjects_seeded, register_cli
+
+migrate = Migrate()
+limiter = Limiter(key_func=get_remote_address)
+
 
-from .models import db, ensure_subjects_seeded
+def _cached_settings(config) -> SimpleNamespace:
+    try:
+        slot_minutes = int(config.get('BOOKING_SLOT_MINUTES', 30))
+    except (TypeError, ValueError):
+        slot_minutes = 30
+    return SimpleNamespace(
+        slot_minutes=slot_minutes,
+        textbelt_url=config.get('TEXTBELT_URL', 'https://textbelt.com/text'),
+        textbelt_key=config.get('TEXTBELT_API_KEY'),
+        textbelt_sender=config.get('TEXTBELT_SENDER', 'PVHS Peer Tutoring'),
+    )
 
 
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object('config.Config')
+    app.extensions['pvhs_cfg'] = _cached_settings(app.config)
+
+    jinja_cache_dir = os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(jinja_cache_dir, exist_ok=True)
+    app.jinja_env.auto_reload = app.debug
+    app.jinja_env.cache_size = 400
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=jinja_cache_dir)
 
     db.init_app(app)
+    migrate.init_app(app, db, render_as_batch=True)
+    limiter.init_app(app)
 
     with app.app_context():
-        db.create_all()
-        ensure_subjects_seeded()
+        # Schema changes ship as Alembic migrations (`flask db upgrade`);
+        # only throwaway test databases are created directly from the models.
+        if app.config.get('TESTING'):
+            db.create_all()
+        if app.config.get('AUTO_SEED'):
+            try:
+                ensure_subjects_seeded()
+            except (OperationalError, ProgrammingError):
+                db.session.rollback()
+                app.logger.warning('Skipping subject seeding; run `flask db upgrade` to create the schema.')
+
+    register_cli(app)
 
     from .services import notifications
     notifications.init_app(app)
 
+    from . import debug_loaders
+    debug_loaders.init_app(app)
+
     from .tutor_routes import tutor_bp
     from .student_routes import student_bp
     from .admin_routes import admin_bp
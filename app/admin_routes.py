@@ -2,17 +2,18 @@ import datetime as dt
 from functools import wraps
 
 from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from werkzeug.security import generate_password_hash
 
 from .models import Booking, Subject, Tutor, db
-from .utils.subjects import group_subjects
+from .utils.phone import phone_digits
+from .utils.subjects import get_grouped_subjects, parse_subject_ids
 
 
 admin_bp = Blueprint('admin', __name__, template_folder='templates/admin')
 
-
-def _normalize_phone(raw: str) -> str:
-    return ''.join(ch for ch in raw if ch.isdigit())
+BOOKINGS_PER_PAGE = 50
 
 
 def _format_phone_display(digits: str) -> str:
@@ -66,13 +67,26 @@ def admin_index():
 @admin_bp.route('/dashboard')
 @admin_login_required
 def dashboard():
-    bookings = Booking.query.order_by(Booking.start_time.asc()).all()
-    tutors = Tutor.query.order_by(Tutor.name.asc()).all()
-    grouped_subjects = group_subjects(Subject.ordered())
     today = dt.date.today()
+    page = request.args.get('page', 1, type=int)
+    window_start = dt.datetime.combine(today - dt.timedelta(days=1), dt.time.min)
+    pagination = (
+        Booking.query.options(selectinload(Booking.tutor), selectinload(Booking.subject))
+        .filter(Booking.start_time >= window_start)
+        .order_by(Booking.start_time.asc())
+        .paginate(page=page, per_page=BOOKINGS_PER_PAGE, error_out=False)
+    )
+    # (tutor, active booking count) pairs; the count is a correlated subquery, not a loaded collection.
+    tutors = db.session.execute(
+        select(Tutor, Tutor.total_bookings())
+        .options(selectinload(Tutor.subjects))
+        .order_by(Tutor.name.asc())
+    ).all()
+    grouped_subjects = get_grouped_subjects()
     return render_template(
         'admin/dashboard.html',
-        bookings=bookings,
+        bookings=pagination.items,
+        pagination=pagination,
         tutors=tutors,
         grouped_subjects=grouped_subjects,
         today=today,
@@ -84,9 +98,9 @@ def dashboard():
 @admin_login_required
 def add_tutor():
     name = request.form.get('name', '').strip()
-    phone = _normalize_phone(request.form.get('phone', ''))
+    phone = phone_digits(request.form.get('phone', ''))
     pin = request.form.get('pin', '').strip()
-    subject_ids = [int(value) for value in request.form.getlist('subjects') if value.isdigit()]
+    subject_ids = parse_subject_ids(request.form.getlist('subjects'))
 
     if not (name and phone and pin):
         flash('Name, phone, and PIN are required.', 'danger')
@@ -98,7 +112,11 @@ def add_tutor():
         flash('A tutor with that phone number already exists.', 'warning')
         return redirect(url_for('admin.dashboard'))
 
-    tutor = Tutor(name=name, phone=phone, pin_hash=generate_password_hash(pin))
+    tutor = Tutor(
+        name=name,
+        phone=phone,
+        pin_hash=generate_password_hash(pin, method=current_app.config['PIN_HASH_METHOD']),
+    )
     if subject_ids:
         tutor.subjects = Subject.query.filter(Subject.id.in_(subject_ids)).all()
     db.session.add(tutor)
@@ -122,7 +140,7 @@ def toggle_tutor_active(tutor_id: int):
 @admin_login_required
 def delete_tutor(tutor_id: int):
     tutor = Tutor.query.get_or_404(tutor_id)
-    if tutor.bookings:
+    if db.session.query(Booking.query.filter_by(tutor_id=tutor.id).exists()).scalar():
         flash('Cannot delete tutor with existing bookings. Deactivate instead.', 'warning')
         return redirect(url_for('admin.dashboard'))
     db.session.delete(tutor)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import raiseload
+
+from .models import db
+
+
+def _raise_on_lazy_load(orm_execute_state) -> None:
+    # The listener lives on Flask-SQLAlchemy's shared Session class, so check the
+    # flag of the app that is actually running this query.
+    if not has_app_context() or not current_app.config.get('RAISE_ON_LAZY_LOAD'):
+        return
+    if not orm_execute_state.is_select:
+        return
+    if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+        return
+    orm_execute_state.statement = orm_execute_state.statement.options(raiseload('*', sql_only=True))
+
+
+def init_app(app) -> None:
+    """Make any relationship that was not eager-loaded raise instead of emitting SQL.
+
+    Enabled with ``RAISE_ON_LAZY_LOAD`` so missing ``selectinload`` options in
+    route code surface as errors during development rather than as N+1 queries.
+    """
+    if not app.config.get('RAISE_ON_LAZY_LOAD'):
+        return
+    if not event.contains(db.session, 'do_orm_execute', _raise_on_lazy_load):
+        event.listen(db.session, 'do_orm_execute', _raise_on_lazy_load)
@@ -6,12 +6,30 @@ from typing import Dict, List, Tuple
 
 from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import (
+    Index,
+    UniqueConstraint,
+    and_,
+    case,
+    event,
+    exists,
+    extract,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.orm import relationship
 
 
 db = SQLAlchemy()
 
+MINUTES_PER_DAY = 24 * 60
+
 
 class Subject(db.Model):
     __tablename__ = 'subjects'
@@ -39,38 +57,39 @@ class Tutor(db.Model):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
     subjects = relationship('Subject', secondary='tutor_subjects', back_populates='tutors')
-    weekly_availability = relationship('WeeklyAvailability', cascade='all, delete-orphan', back_populates='tutor')
-    exceptions = relationship('TutorException', cascade='all, delete-orphan', back_populates='tutor')
+    weekly_availability = relationship(
+        'WeeklyAvailability',
+        cascade='all, delete-orphan',
+        back_populates='tutor',
+        order_by='(WeeklyAvailability.day_of_week, WeeklyAvailability.start_time)',
+    )
+    exceptions = relationship(
+        'TutorException',
+        cascade='all, delete-orphan',
+        back_populates='tutor',
+        order_by='(TutorException.date, TutorException.start_time.nulls_first())',
+    )
     bookings = relationship('Booking', cascade='all, delete-orphan', back_populates='tutor')
 
+    @hybrid_method
     def total_bookings(self) -> int:
         return sum(1 for booking in self.bookings if not booking.is_canceled)
 
-    def availability_for_day(self, weekday: int) -> List['WeeklyAvailability']:
-        return [avail for avail in self.weekly_availability if avail.day_of_week == weekday]
-
-    def is_available_for_slot(self, start_dt: dt.datetime, end_dt: dt.datetime) -> bool:
-        for exception in self.exceptions:
-            if exception.overlaps(start_dt, end_dt):
-                return False
-        blocks = self.availability_for_day(start_dt.weekday())
-        block_matches = any(
-            block.start_time <= start_dt.time() and block.end_time >= end_dt.time()
-            for block in blocks
+    @total_bookings.expression
+    def total_bookings(cls):
+        return (
+            select(func.count(Booking.id))
+            .where(Booking.tutor_id == cls.id, Booking.is_canceled.is_(False))
+            .scalar_subquery()
         )
-        if not block_matches:
-            return False
-        for booking in self.bookings:
-            if booking.is_canceled:
-                continue
-            if booking.start_time < end_dt and booking.end_time > start_dt:
-                return False
-        return True
 
 
 class TutorSubject(db.Model):
     __tablename__ = 'tutor_subjects'
-    __table_args__ = (UniqueConstraint('tutor_id', 'subject_id', name='uq_tutor_subject'),)
+    __table_args__ = (
+        UniqueConstraint('tutor_id', 'subject_id', name='uq_tutor_subject'),
+        Index('ix_tutor_subject_subject', 'subject_id', 'tutor_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tutor_id = db.Column(db.Integer, db.ForeignKey('tutors.id', ondelete='CASCADE'), nullable=False)
@@ -79,6 +98,7 @@ class TutorSubject(db.Model):
 
 class WeeklyAvailability(db.Model):
     __tablename__ = 'weekly_availability'
+    __table_args__ = (Index('ix_wa_tutor_day', 'tutor_id', 'day_of_week'),)
 
     id = db.Column(db.Integer, primary_key=True)
     tutor_id = db.Column(db.Integer, db.ForeignKey('tutors.id', ondelete='CASCADE'), nullable=False)
@@ -88,17 +108,6 @@ class WeeklyAvailability(db.Model):
 
     tutor = relationship('Tutor', back_populates='weekly_availability')
 
-    def generate_slots(self, date: dt.date, slot_minutes: int) -> List[Tuple[dt.datetime, dt.datetime]]:
-        slots: List[Tuple[dt.datetime, dt.datetime]] = []
-        start_dt = dt.datetime.combine(date, self.start_time)
-        end_dt = dt.datetime.combine(date, self.end_time)
-        step = dt.timedelta(minutes=slot_minutes)
-        cursor = start_dt
-        while cursor + step <= end_dt:
-            slots.append((cursor, cursor + step))
-            cursor += step
-        return slots
-
 
 class TutorException(db.Model):
     __tablename__ = 'tutor_exceptions'
@@ -116,21 +125,21 @@ class TutorException(db.Model):
     def is_full_day(self) -> bool:
         return self.start_time is None and self.end_time is None
 
-    def overlaps(self, start_dt: dt.datetime, end_dt: dt.datetime) -> bool:
-        if self.date != start_dt.date():
-            return False
-        if self.is_full_day():
-            return True
-        if self.start_time is None or self.end_time is None:
-            return True
-        exc_start = dt.datetime.combine(self.date, self.start_time)
-        exc_end = dt.datetime.combine(self.date, self.end_time)
-        return start_dt < exc_end and end_dt > exc_start
-
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
-    __table_args__ = (UniqueConstraint('tutor_id', 'start_time', name='uq_tutor_booking_start'),)
+    __table_args__ = (
+        UniqueConstraint('tutor_id', 'start_time', name='uq_tutor_booking_start'),
+        Index('ix_booking_tutor_start', 'tutor_id', 'start_time', 'end_time'),
+        Index('ix_booking_tutor_active_start', 'tutor_id', 'is_canceled', 'start_time'),
+        Index('ix_booking_tutor_canceled_at', 'tutor_id', 'is_canceled', 'canceled_at'),
+        Index(
+            'ix_booking_active_time',
+            'start_time',
+            sqlite_where=text('is_canceled IS 0'),
+            postgresql_where=text('is_canceled IS false'),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tutor_id = db.Column(db.Integer, db.ForeignKey('tutors.id', ondelete='CASCADE'), nullable=False)
@@ -152,6 +161,22 @@ class Booking(db.Model):
         return not self.is_canceled
 
 
+_subjects_version = 0
+
+
+def subjects_version() -> int:
+    return _subjects_version
+
+
+def _bump_subjects_version(*args) -> None:
+    global _subjects_version
+    _subjects_version += 1
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Subject, _event_name, _bump_subjects_version)
+
+
 SUBJECT_GROUPS: List[Tuple[str, List[str]]] = [
     ('Math Subjects', [
         'IM1',
@@ -213,64 +238,184 @@ SUBJECT_GROUPS: List[Tuple[str, List[str]]] = [
 ]
 
 
-def ensure_subjects_seeded() -> None:
-    existing = {subject.name: subject for subject in Subject.query.all()}
+_UPSERT_INSERTS = {
+    'sqlite': sqlite_insert,
+    'postgresql': postgresql_insert,
+}
+
+
+def _subject_rows() -> List[dict]:
+    rows: List[dict] = []
     order = 1
     for category, names in SUBJECT_GROUPS:
         for name in names:
-            subject = existing.get(name)
+            rows.append({'name': name, 'category': category, 'sort_order': order})
+            order += 1
+    return rows
+
+
+def _seed_subjects_orm(rows: List[dict]) -> None:
+    existing = {subject.name: subject for subject in Subject.query.all()}
+    new_rows: List[dict] = []
+    with db.session.no_autoflush:
+        for row in rows:
+            subject = existing.get(row['name'])
             if subject is None:
-                subject = Subject(name=name, category=category, sort_order=order)
-                db.session.add(subject)
+                new_rows.append(row)
             else:
-                subject.category = category
-                subject.sort_order = order
-            order += 1
+                subject.category = row['category']
+                subject.sort_order = row['sort_order']
+    if new_rows:
+        db.session.bulk_insert_mappings(Subject, new_rows)
+
+
+def ensure_subjects_seeded() -> None:
+    rows = _subject_rows()
+    insert = _UPSERT_INSERTS.get(db.engine.dialect.name)
+    if insert is None:
+        _seed_subjects_orm(rows)
+    else:
+        stmt = insert(Subject).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Subject.name],
+            set_={'category': stmt.excluded.category, 'sort_order': stmt.excluded.sort_order},
+        )
+        db.session.execute(stmt)
     db.session.commit()
+    # The bulk upsert bypasses ORM events, so invalidate cached subject lists here.
+    _bump_subjects_version()
+
+
+def register_cli(app):
+    @app.cli.command('seed-subjects')
+    def seed_subjects_command():
+        """Insert or update the subject catalog."""
+        with app.app_context():
+            ensure_subjects_seeded()
+            app.logger.info('Seeded %s subjects.', len(_subject_rows()))
 
 
 def available_tutors_for_slot(subject_id: int, start_dt: dt.datetime, end_dt: dt.datetime) -> List[Tutor]:
-    tutors = (
+    start_time = start_dt.time()
+    end_time = end_dt.time()
+    covering_block = exists().where(
+        WeeklyAvailability.tutor_id == Tutor.id,
+        WeeklyAvailability.day_of_week == start_dt.weekday(),
+        WeeklyAvailability.start_time <= start_time,
+        WeeklyAvailability.end_time >= end_time,
+    )
+    blocking_exception = exists().where(
+        TutorException.tutor_id == Tutor.id,
+        TutorException.date == start_dt.date(),
+        or_(
+            TutorException.start_time.is_(None),
+            TutorException.end_time.is_(None),
+            and_(TutorException.start_time < end_time, TutorException.end_time > start_time),
+        ),
+    )
+    overlapping_booking = exists().where(
+        Booking.tutor_id == Tutor.id,
+        Booking.is_canceled.is_(False),
+        Booking.start_time < end_dt,
+        Booking.end_time > start_dt,
+    )
+    return (
         Tutor.query.join(TutorSubject)
-        .filter(TutorSubject.subject_id == subject_id, Tutor.is_active.is_(True))
+        .filter(
+            TutorSubject.subject_id == subject_id,
+            Tutor.is_active.is_(True),
+            covering_block,
+            ~blocking_exception,
+            ~overlapping_booking,
+        )
         .all()
     )
 
-    eligible: List[Tutor] = []
-    for tutor in tutors:
-        if tutor.is_available_for_slot(start_dt, end_dt):
-            eligible.append(tutor)
-
-    return eligible
-
 
 def pick_fair_tutor(candidates: List[Tutor]) -> Tutor | None:
     if not candidates:
         return None
-    booking_counts = {
-        tutor.id: sum(1 for booking in tutor.bookings if not booking.is_canceled)
-        for tutor in candidates
-    }
-    min_count = min(booking_counts.values())
-    smallest = [tutor for tutor in candidates if booking_counts[tutor.id] == min_count]
+    booking_counts = dict(
+        db.session.query(Booking.tutor_id, func.count(Booking.id))
+        .filter(
+            Booking.tutor_id.in_([tutor.id for tutor in candidates]),
+            Booking.is_canceled.is_(False),
+        )
+        .group_by(Booking.tutor_id)
+        .all()
+    )
+    min_count = min(booking_counts.get(tutor.id, 0) for tutor in candidates)
+    smallest = [tutor for tutor in candidates if booking_counts.get(tutor.id, 0) == min_count]
     return random.choice(smallest)
 
+def _minute_of_day(column):
+    return extract('hour', column) * 60 + extract('minute', column)
+
+
 def collect_open_slots(subject_id: int, target_date: dt.date) -> Dict[dt.datetime, List[Tutor]]:
-    """Return a mapping of slot start times to available tutors for a given subject/date."""
-    slot_minutes = int(current_app.config.get('BOOKING_SLOT_MINUTES', 30))
-    tutors = (
-        Tutor.query.join(TutorSubject)
-        .filter(TutorSubject.subject_id == subject_id, Tutor.is_active.is_(True))
-        .all()
+    """Return a mapping of slot start times to available tutors for a given subject/date.
+
+    Slots are enumerated in SQL: a recursive CTE of slot offsets is joined against each
+    weekly block for the weekday, and slots that hit a blackout or an active booking are
+    anti-joined away, so the whole map comes back from a single query.
+    """
+    slot_minutes = current_app.extensions['pvhs_cfg'].slot_minutes
+    day_start = dt.datetime.combine(target_date, dt.time.min)
+    day_end = day_start + dt.timedelta(days=1)
+
+    offsets = select(literal(0).label('n')).cte('slot_offsets', recursive=True)
+    offsets = offsets.union_all(
+        select(offsets.c.n + 1).where(offsets.c.n < MINUTES_PER_DAY // slot_minutes - 1)
+    )
+    slot_start = _minute_of_day(WeeklyAvailability.start_time) + offsets.c.n * slot_minutes
+    slot_end = slot_start + slot_minutes
+
+    blocking_exception = exists().where(
+        TutorException.tutor_id == Tutor.id,
+        TutorException.date == target_date,
+        or_(
+            TutorException.start_time.is_(None),
+            TutorException.end_time.is_(None),
+            and_(
+                _minute_of_day(TutorException.start_time) < slot_end,
+                _minute_of_day(TutorException.end_time) > slot_start,
+            ),
+        ),
+    )
+    booking_start = case(
+        (Booking.start_time < day_start, -1),
+        else_=_minute_of_day(Booking.start_time),
     )
+    booking_end = case(
+        (Booking.end_time >= day_end, MINUTES_PER_DAY),
+        else_=_minute_of_day(Booking.end_time),
+    )
+    overlapping_booking = exists().where(
+        Booking.tutor_id == Tutor.id,
+        Booking.is_canceled.is_(False),
+        Booking.start_time < day_end,
+        Booking.end_time > day_start,
+        booking_start < slot_end,
+        booking_end > slot_start,
+    )
+
+    stmt = (
+        select(slot_start.label('slot_start'), Tutor)
+        .join(TutorSubject, TutorSubject.tutor_id == Tutor.id)
+        .join(WeeklyAvailability, WeeklyAvailability.tutor_id == Tutor.id)
+        .join(offsets, slot_end <= _minute_of_day(WeeklyAvailability.end_time))
+        .where(
+            TutorSubject.subject_id == subject_id,
+            Tutor.is_active.is_(True),
+            WeeklyAvailability.day_of_week == target_date.weekday(),
+            ~blocking_exception,
+            ~overlapping_booking,
+        )
+        .distinct()
+        .order_by('slot_start')
+    )
+
     slots: Dict[dt.datetime, List[Tutor]] = {}
-    weekday = target_date.weekday()
-    for tutor in tutors:
-        availabilities = tutor.availability_for_day(weekday)
-        if not availabilities:
-            continue
-        for block in availabilities:
-            for start_dt, end_dt in block.generate_slots(target_date, slot_minutes):
-                if tutor.is_available_for_slot(start_dt, end_dt):
-                    slots.setdefault(start_dt, []).append(tutor)
+    for minute, tutor in db.session.execute(stmt):
+        slots.setdefault(day_start + dt.timedelta(minutes=int(minute)), []).append(tutor)
     return slots
@@ -1,20 +1,28 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Iterable, List, Tuple
 
 import requests
-from zoneinfo import ZoneInfo
+from requests.adapters import HTTPAdapter
 
 from flask import current_app
+from sqlalchemy.orm import selectinload
 
 from ..models import Booking
+from ..utils.clock import PST
+from ..utils.phone import phone_digits
 
-PST = ZoneInfo('America/Los_Angeles')
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='sms')
 
 
+@lru_cache(maxsize=4096)
 def _normalize_phone(raw: str) -> str:
-    digits = ''.join(ch for ch in raw if ch.isdigit())
+    digits = phone_digits(raw)
     if len(digits) == 10:
         return f"+1{digits}"
     if raw.startswith('+'):
@@ -23,23 +31,22 @@ def _normalize_phone(raw: str) -> str:
 
 
 def _send_sms(phone: str, message: str) -> bool:
-    api_key = current_app.config.get('TEXTBELT_API_KEY')
+    settings = current_app.extensions['pvhs_cfg']
+    api_key = settings.textbelt_key
     if not api_key:
         current_app.logger.info(
             "Skipping SMS to %s because TEXTBELT_API_KEY is not configured.", phone
         )
         return False
 
-    url = current_app.config.get('TEXTBELT_URL', 'https://textbelt.com/text')
-    sender = current_app.config.get('TEXTBELT_SENDER', 'PVHS Peer Tutoring')
     payload = {
         'phone': phone,
         'message': message,
-        'sender': sender,
+        'sender': settings.textbelt_sender,
         'key': api_key,
     }
     try:
-        response = requests.post(url, data=payload, timeout=10)
+        response = _session.post(settings.textbelt_url, data=payload, timeout=10)
         response.raise_for_status()
         data = response.json()
         if not data.get('success'):
@@ -53,13 +60,26 @@ def _send_sms(phone: str, message: str) -> bool:
         return False
 
 
-def format_slot_label(booking: Booking) -> str:
+def _send_sms_with_app(app, phone: str, message: str) -> bool:
+    with app.app_context():
+        return _send_sms(phone, message)
+
+
+def _dispatch_sms(messages: Iterable[Tuple[str, str]]) -> List[Future]:
+    """Queue (phone, message) pairs on the shared SMS pool and return their futures."""
+    app = current_app._get_current_object()
+    return [_executor.submit(_send_sms_with_app, app, phone, message) for phone, message in messages]
+
+
+def _local_start(booking: Booking) -> dt.datetime:
     start_time = booking.start_time
     if start_time.tzinfo is None:
-        start_local = start_time
-    else:
-        start_local = start_time.astimezone(PST)
-    return start_local.strftime('%A, %B %d at %I:%M %p').replace(' 0', ' ')
+        return start_time
+    return start_time.astimezone(PST)
+
+
+def format_slot_label(booking: Booking) -> str:
+    return _local_start(booking).strftime('%A, %B %d at %I:%M %p').replace(' 0', ' ')
 
 
 def send_booking_notifications(booking: Booking) -> None:
@@ -79,8 +99,7 @@ def send_booking_notifications(booking: Booking) -> None:
         f"for {subject_name}. Visit the tutor portal if you need to cancel."
     )
 
-    _send_sms(student_phone, student_message)
-    _send_sms(tutor_phone, tutor_message)
+    _dispatch_sms([(student_phone, student_message), (tutor_phone, tutor_message)])
 
 
 def send_cancellation_notification(booking: Booking) -> None:
@@ -91,17 +110,17 @@ def send_cancellation_notification(booking: Booking) -> None:
         f"PVHS Peer Tutoring: Tutor {tutor.name} has canceled your session on {slot_label}. "
         "Please book another time."
     )
-    _send_sms(student_phone, message)
+    _dispatch_sms([(student_phone, message)])
 
 
 def send_reminder_notifications(bookings: Iterable[Booking]) -> None:
+    messages: List[Tuple[str, str]] = []
     for booking in bookings:
         if booking.is_canceled:
             continue
         tutor = booking.tutor
         subject_name = booking.subject.name if booking.subject else 'tutoring'
-        slot_label = format_slot_label(booking)
-        time_only = slot_label.split(' at ')[-1]
+        time_only = _local_start(booking).strftime('%I:%M %p').lstrip('0')
 
         student_phone = _normalize_phone(booking.student_phone)
         tutor_phone = _normalize_phone(tutor.phone)
@@ -114,13 +133,16 @@ def send_reminder_notifications(bookings: Iterable[Booking]) -> None:
             f"for {subject_name}."
         )
 
-        _send_sms(student_phone, student_msg)
-        _send_sms(tutor_phone, tutor_msg)
+        messages.append((student_phone, student_msg))
+        messages.append((tutor_phone, tutor_msg))
+
+    wait(_dispatch_sms(messages))
 
 
 def reminder_candidates(window_start: dt.datetime, window_end: dt.datetime) -> Iterable[Booking]:
     return (
-        Booking.query.filter(
+        Booking.query.options(selectinload(Booking.tutor), selectinload(Booking.subject))
+        .filter(
             Booking.is_canceled.is_(False),
             Booking.start_time >= window_start,
             Booking.start_time < window_end,
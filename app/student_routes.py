@@ -1,7 +1,7 @@
 import datetime as dt
-from zoneinfo import ZoneInfo
 
 from flask import Blueprint, current_app, flash, jsonify, render_template, request
+from sqlalchemy.exc import IntegrityError
 
 from .models import (
     Booking,
@@ -12,22 +12,20 @@ from .models import (
     db,
 )
 from .services.notifications import send_booking_notifications
-from .utils.subjects import group_subjects
+from .utils.clock import pacific_now
+from .utils.phone import phone_digits
+from .utils.subjects import get_grouped_subjects
 
 
 student_bp = Blueprint('student', __name__, template_folder='templates/student')
 
 
-PST = ZoneInfo('America/Los_Angeles')
-
-
-def _pacific_now() -> dt.datetime:
-    return dt.datetime.now(PST)
+MAX_BOOKING_ATTEMPTS = 3
 
 
 def _minimum_bookable_date(now: dt.datetime | None = None) -> dt.date:
     if now is None:
-        now = _pacific_now()
+        now = pacific_now()
     min_date = now.date() + dt.timedelta(days=1)
     if now.time() >= dt.time(22, 0):
         min_date += dt.timedelta(days=1)
@@ -35,7 +33,7 @@ def _minimum_bookable_date(now: dt.datetime | None = None) -> dt.date:
 
 
 def _booking_window_status(target_date: dt.date) -> tuple[bool, str, dt.date]:
-    now = _pacific_now()
+    now = pacific_now()
     min_date = _minimum_bookable_date(now)
     if target_date < min_date:
         if target_date <= now.date():
@@ -47,15 +45,8 @@ def _booking_window_status(target_date: dt.date) -> tuple[bool, str, dt.date]:
     return True, '', min_date
 
 
-def _normalize_phone(raw: str) -> str:
-    return ''.join(ch for ch in raw if ch.isdigit())
-
-
 def _slot_minutes() -> int:
-    try:
-        return int(current_app.config.get('BOOKING_SLOT_MINUTES', 30))
-    except (TypeError, ValueError):
-        return 30
+    return current_app.extensions['pvhs_cfg'].slot_minutes
 
 
 def _format_phone_display(digits: str) -> str:
@@ -112,7 +103,7 @@ def book():
     }
 
     name = form_values['student_name'].strip()
-    phone = _normalize_phone(form_values['student_phone'])
+    phone = phone_digits(form_values['student_phone'])
     subject_id_raw = form_values['subject_id']
     date_str = form_values['date']
     start_time_str = form_values['start_time']
@@ -148,27 +139,37 @@ def book():
     end_dt = start_dt + dt.timedelta(minutes=_slot_minutes())
 
     candidates = available_tutors_for_slot(subject_id, start_dt, end_dt)
-    tutor = pick_fair_tutor(candidates)
-    if tutor is None:
+    booking = None
+    for _ in range(MAX_BOOKING_ATTEMPTS):
+        tutor = pick_fair_tutor(candidates)
+        if tutor is None:
+            break
+        booking = Booking(
+            tutor_id=tutor.id,
+            subject_id=subject.id,
+            student_name=name,
+            student_phone=phone,
+            start_time=start_dt,
+            end_time=end_dt,
+        )
+        db.session.add(booking)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            # Another request took this tutor's slot first; try the next-fairest tutor.
+            db.session.rollback()
+            candidates = [candidate for candidate in candidates if candidate.id != tutor.id]
+            booking = None
+        except Exception:
+            db.session.rollback()
+            flash('Unable to confirm booking. Please try another time slot.', 'danger')
+            return _render_booking_page(form_values)
+
+    if booking is None:
         flash('Sorry, that time was just booked. Please choose another slot.', 'warning')
         return _render_booking_page(form_values)
 
-    booking = Booking(
-        tutor_id=tutor.id,
-        subject_id=subject.id,
-        student_name=name,
-        student_phone=phone,
-        start_time=start_dt,
-        end_time=end_dt,
-    )
-    db.session.add(booking)
-    try:
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-        flash('Unable to confirm booking. Please try another time slot.', 'danger')
-        return _render_booking_page(form_values)
-
     send_booking_notifications(booking)
 
     slot_label = start_dt.strftime('%A, %B %d at %I:%M %p').replace(' 0', ' ')
@@ -184,8 +185,7 @@ def book():
 
 
 def _render_booking_page(form_values: dict | None = None):
-    subjects = Subject.ordered()
-    grouped_subjects = group_subjects(subjects)
+    grouped_subjects = get_grouped_subjects()
     min_date = _minimum_bookable_date()
     min_date_iso = min_date.isoformat()
     values = dict(form_values or {})
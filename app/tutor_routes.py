@@ -1,15 +1,28 @@
 import datetime as dt
-from functools import wraps
+from functools import lru_cache, partial, wraps
+from itertools import chain
 
-from flask import Blueprint, flash, redirect, render_template, request, session, url_for
-from werkzeug.security import check_password_hash, generate_password_hash
+from flask import Blueprint, current_app, flash, g, redirect, render_template, request, session, url_for
+from flask_limiter.util import get_remote_address
+from sqlalchemy import and_, lambda_stmt, literal, or_, select
+from sqlalchemy.orm import selectinload
+from werkzeug.security import generate_password_hash
 
-from .models import Booking, Subject, Tutor, TutorException, WeeklyAvailability, db
+from . import limiter
+from .models import Booking, Subject, Tutor, TutorException, TutorSubject, WeeklyAvailability, db
 from .services.notifications import send_cancellation_notification
-from .utils.subjects import group_subjects
+from .utils.clock import pacific_now
+from .utils.phone import phone_digits
+from .utils.pw_cache import verify_password
+from .utils.subjects import get_grouped_subjects, parse_subject_ids
 
 tutor_bp = Blueprint('tutor', __name__, template_folder='templates/tutor')
 
+UPCOMING_BOOKINGS_LIMIT = 25
+# Werkzeug's default before PIN_HASH_METHOD existed; hashes from then are upgraded on login.
+LEGACY_PIN_HASH_METHOD = 'scrypt:32768:8:1'
+_METHODS_WITHOUT_LEGACY_HASHES: set[str] = set()
+
 
 @tutor_bp.route('/')
 def index():
@@ -18,29 +31,77 @@ def index():
     return redirect(url_for('tutor.login'))
 
 
-def _normalize_phone(raw: str) -> str:
-    digits = ''.join(ch for ch in raw if ch.isdigit())
-    return digits
-
-
 def _format_phone_display(raw: str) -> str:
-    digits = _normalize_phone(raw)
+    digits = phone_digits(raw)
     if len(digits) == 10:
         return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
     return raw
 
 
+def _parse_clock(raw: str) -> dt.time:
+    # fromisoformat also accepts '15', '1500', seconds and offsets; keep the old HH:MM contract.
+    if len(raw) != 5 or raw[2] != ':':
+        raise ValueError(f'Expected HH:MM, got {raw!r}')
+    return dt.time.fromisoformat(raw)
+
+
+def _now() -> dt.datetime:
+    # canceled_at has always been recorded as naive UTC, so drop tzinfo after reading the aware clock.
+    if 'now' not in g:
+        g.now = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+    return g.now
+
+
 def get_current_tutor() -> Tutor | None:
+    if 'tutor' in g:
+        return g.tutor
+    tutor_id = session.get('tutor_id')
+    g.tutor = Tutor.query.get(tutor_id) if tutor_id else None
+    return g.tutor
+
+
+def get_current_tutor_full() -> Tutor | None:
     tutor_id = session.get('tutor_id')
     if not tutor_id:
         return None
-    return Tutor.query.get(tutor_id)
+    g.tutor = (
+        Tutor.query.options(
+            selectinload(Tutor.weekly_availability),
+            selectinload(Tutor.exceptions),
+            selectinload(Tutor.subjects),
+        )
+        .filter_by(id=tutor_id)
+        .one_or_none()
+    )
+    return g.tutor
+
+
+def _insert_tutor_subjects(tutor_id: int, subject_ids: list[int]) -> None:
+    if not subject_ids:
+        return
+    # Insert from the subjects table so unknown ids are dropped, as the ORM lookup did.
+    db.session.execute(
+        TutorSubject.__table__.insert().from_select(
+            ['tutor_id', 'subject_id'],
+            select(literal(tutor_id), Subject.id).where(Subject.id.in_(subject_ids)),
+        )
+    )
 
 
-def tutor_login_required(view_func):
+def tutor_login_required(view_func=None, *, load=get_current_tutor):
+    """Require a logged-in tutor, caching it on ``g`` via ``load``.
+
+    Views that need eager-loaded collections pass ``load=get_current_tutor_full``
+    so the tutor is fetched once with them rather than twice.
+    """
+    if view_func is None:
+        return partial(tutor_login_required, load=load)
+
     @wraps(view_func)
     def wrapped(*args, **kwargs):
-        if not session.get('tutor_id'):
+        if load() is None:
+            # Covers both a missing session and a tutor deleted mid-session.
+            session.pop('tutor_id', None)
             flash('Please log in to access the tutor portal.', 'warning')
             return redirect(url_for('tutor.login'))
         return view_func(*args, **kwargs)
@@ -50,44 +111,89 @@ def tutor_login_required(view_func):
 
 @tutor_bp.route('/signup', methods=['GET', 'POST'])
 def signup():
-    subjects = Subject.ordered()
-    grouped_subjects = group_subjects(subjects)
     if request.method == 'POST':
         name = request.form.get('name', '').strip()
-        phone = _normalize_phone(request.form.get('phone', ''))
+        phone = phone_digits(request.form.get('phone', ''))
         pin = request.form.get('pin', '').strip()
 
         if not name or not phone or not pin:
             flash('All fields are required.', 'danger')
-            return render_template('tutor/signup.html', grouped_subjects=grouped_subjects)
+            return render_template('tutor/signup.html', grouped_subjects=get_grouped_subjects())
         if len(pin) < 4:
             flash('PIN must be at least 4 characters.', 'danger')
-            return render_template('tutor/signup.html', grouped_subjects=grouped_subjects)
+            return render_template('tutor/signup.html', grouped_subjects=get_grouped_subjects())
         if Tutor.query.filter_by(phone=phone).first():
             flash('A tutor with that phone number already exists. Please log in instead.', 'danger')
             return redirect(url_for('tutor.login'))
 
-        tutor = Tutor(name=name, phone=phone, pin_hash=generate_password_hash(pin))
+        tutor = Tutor(
+            name=name,
+            phone=phone,
+            pin_hash=generate_password_hash(pin, method=current_app.config['PIN_HASH_METHOD']),
+        )
 
-        selected_subject_ids = [int(sid) for sid in request.form.getlist('subjects') if sid.isdigit()]
-        if selected_subject_ids:
-            tutor.subjects = Subject.query.filter(Subject.id.in_(selected_subject_ids)).all()
+        selected_subject_ids = parse_subject_ids(request.form.getlist('subjects'))
         db.session.add(tutor)
+        db.session.flush()
+        _insert_tutor_subjects(tutor.id, selected_subject_ids)
         db.session.commit()
         session['tutor_id'] = tutor.id
         flash('Welcome! You can now set up your availability.', 'success')
         return redirect(url_for('tutor.dashboard'))
 
-    return render_template('tutor/signup.html', grouped_subjects=grouped_subjects)
+    return render_template('tutor/signup.html', grouped_subjects=get_grouped_subjects())
+
+
+def _hash_method(pin_hash: str) -> str:
+    return pin_hash.split('$', 1)[0]
+
+
+@lru_cache(maxsize=None)
+def _dummy_pin_hash(method: str) -> str:
+    return generate_password_hash('!invalid!', method=method)
+
+
+def _miss_pin_hash() -> str:
+    # Until every tutor has logged in and been rehashed, some hashes still use the old
+    # Werkzeug default; verify misses against that so they cost as much as those hits.
+    method = current_app.config['PIN_HASH_METHOD']
+    if method not in _METHODS_WITHOUT_LEGACY_HASHES:
+        legacy_exists = db.session.query(
+            Tutor.query.filter(~Tutor.pin_hash.startswith(f'{method}$', autoescape=True)).exists()
+        ).scalar()
+        if legacy_exists:
+            return _dummy_pin_hash(LEGACY_PIN_HASH_METHOD)
+        # New hashes always use PIN_HASH_METHOD, so once none are left this cannot change.
+        _METHODS_WITHOUT_LEGACY_HASHES.add(method)
+    return _dummy_pin_hash(method)
+
+
+def _login_rate_key() -> str:
+    return f"{get_remote_address()}:{phone_digits(request.form.get('phone', ''))}"
+
+
+@tutor_bp.errorhandler(429)
+def login_rate_limited(error):
+    flash('Too many login attempts. Please wait a minute and try again.', 'danger')
+    return render_template('tutor/login.html'), 429
 
 
 @tutor_bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit(lambda: current_app.config['LOGIN_RATE_LIMIT'], key_func=_login_rate_key, methods=['POST'])
 def login():
     if request.method == 'POST':
-        phone = _normalize_phone(request.form.get('phone', ''))
+        phone = phone_digits(request.form.get('phone', ''))
         pin = request.form.get('pin', '').strip()
         tutor = Tutor.query.filter_by(phone=phone).first()
-        if tutor and check_password_hash(tutor.pin_hash, pin):
+        # Always run the KDF so an unknown phone takes as long as a wrong PIN.
+        pin_hash = tutor.pin_hash if tutor else _miss_pin_hash()
+        valid = verify_password(pin_hash, pin)
+        if tutor and valid:
+            method = current_app.config['PIN_HASH_METHOD']
+            if _hash_method(tutor.pin_hash) != method:
+                # Move hashes made under an older default (e.g. scrypt) onto the configured cost.
+                tutor.pin_hash = generate_password_hash(pin, method=method)
+                db.session.commit()
             session['tutor_id'] = tutor.id
             flash('Logged in successfully.', 'success')
             return redirect(url_for('tutor.dashboard'))
@@ -99,57 +205,59 @@ def login():
 @tutor_login_required
 def logout():
     session.pop('tutor_id', None)
+    g.pop('tutor', None)
     flash('Logged out.', 'info')
     return redirect(url_for('tutor.login'))
 
 
 @tutor_bp.route('/dashboard')
-@tutor_login_required
+@tutor_login_required(load=get_current_tutor_full)
 def dashboard():
     tutor = get_current_tutor()
-    if tutor is None:
-        flash('Please log in to access the tutor portal.', 'warning')
-        return redirect(url_for('tutor.login'))
-    subjects = Subject.ordered()
-    grouped_subjects = group_subjects(subjects)
+    grouped_subjects = get_grouped_subjects()
     weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    availability_blocks = sorted(
-        tutor.weekly_availability,
-        key=lambda block: (block.day_of_week, block.start_time),
-    )
-    exception_list = sorted(
-        tutor.exceptions,
-        key=lambda exc: (exc.date, exc.start_time or dt.time.min),
-    )
-    now_utc = dt.datetime.utcnow()
-    upcoming_bookings = (
-        Booking.query.filter(
-            Booking.tutor_id == tutor.id,
-            Booking.is_canceled.is_(False),
-            Booking.start_time >= now_utc,
+    # start_time holds naive Pacific wall-clock time, as built by the student booking form.
+    now_local = pacific_now().replace(tzinfo=None)
+    tutor_id = tutor.id
+    # lambda_stmt caches the compiled SQL per process; tutor_id and now_local become bound parameters.
+    upcoming_bookings = db.session.scalars(
+        lambda_stmt(
+            lambda: select(Booking)
+            .options(selectinload(Booking.subject))
+            .where(
+                Booking.tutor_id == tutor_id,
+                Booking.is_canceled.is_(False),
+                Booking.start_time >= now_local,
+            )
+            .order_by(Booking.start_time.asc())
+            .limit(UPCOMING_BOOKINGS_LIMIT)
         )
-        .order_by(Booking.start_time.asc())
-        .all()
-    )
-    recent_cancellations = (
-        Booking.query.filter(
-            Booking.tutor_id == tutor.id,
-            Booking.is_canceled.is_(True),
+    ).all()
+    recent_cancellations = db.session.scalars(
+        lambda_stmt(
+            lambda: select(Booking)
+            .options(selectinload(Booking.subject))
+            .where(Booking.tutor_id == tutor_id, Booking.is_canceled.is_(True))
+            .order_by(Booking.canceled_at.desc())
+            .limit(5)
         )
-        .order_by(Booking.canceled_at.desc())
-        .limit(5)
-        .all()
-    )
+    ).all()
+    phone_cache = {
+        booking.student_phone: _format_phone_display(booking.student_phone)
+        for booking in chain(upcoming_bookings, recent_cancellations)
+    }
     return render_template(
         'tutor/dashboard.html',
         tutor=tutor,
         grouped_subjects=grouped_subjects,
         weekday_names=weekday_names,
-        availability_blocks=availability_blocks,
-        exception_list=exception_list,
+        availability_blocks=tutor.weekly_availability,
+        exception_list=tutor.exceptions,
         upcoming_bookings=upcoming_bookings,
+        upcoming_limit=UPCOMING_BOOKINGS_LIMIT,
         recent_cancellations=recent_cancellations,
-        format_phone=_format_phone_display,
+        tutor_phone_display=_format_phone_display(tutor.phone),
+        phone_cache=phone_cache,
     )
 
 
@@ -157,8 +265,10 @@ def dashboard():
 @tutor_login_required
 def update_subjects():
     tutor = get_current_tutor()
-    selected_subject_ids = [int(sid) for sid in request.form.getlist('subjects') if sid.isdigit()]
-    tutor.subjects = Subject.query.filter(Subject.id.in_(selected_subject_ids)).all()
+    selected_subject_ids = parse_subject_ids(request.form.getlist('subjects'))
+    tutor_subjects = TutorSubject.__table__
+    db.session.execute(tutor_subjects.delete().where(tutor_subjects.c.tutor_id == tutor.id))
+    _insert_tutor_subjects(tutor.id, selected_subject_ids)
     db.session.commit()
     flash('Subjects updated.', 'success')
     return redirect(url_for('tutor.dashboard'))
@@ -174,8 +284,8 @@ def add_availability():
 
     try:
         day_idx = int(day)
-        start_time = dt.datetime.strptime(start, '%H:%M').time()
-        end_time = dt.datetime.strptime(end, '%H:%M').time()
+        start_time = _parse_clock(start)
+        end_time = _parse_clock(end)
     except (ValueError, TypeError):
         flash('Invalid availability input.', 'danger')
         return redirect(url_for('tutor.dashboard'))
@@ -194,11 +304,8 @@ def add_availability():
 @tutor_bp.route('/availability/<int:availability_id>/delete', methods=['POST'])
 @tutor_login_required
 def delete_availability(availability_id: int):
-    availability = WeeklyAvailability.query.get_or_404(availability_id)
     tutor = get_current_tutor()
-    if availability.tutor_id != tutor.id:
-        flash('You cannot modify another tutor\'s availability.', 'danger')
-        return redirect(url_for('tutor.dashboard'))
+    availability = WeeklyAvailability.query.filter_by(id=availability_id, tutor_id=tutor.id).first_or_404()
     db.session.delete(availability)
     db.session.commit()
     flash('Availability removed.', 'info')
@@ -214,7 +321,7 @@ def add_exception():
     end_str = request.form.get('end_time')
     note = request.form.get('note', '').strip() or None
     try:
-        date_obj = dt.datetime.strptime(date_str, '%Y-%m-%d').date()
+        date_obj = dt.date.fromisoformat(date_str)
     except (ValueError, TypeError):
         flash('Invalid date for unavailability.', 'danger')
         return redirect(url_for('tutor.dashboard'))
@@ -225,8 +332,8 @@ def add_exception():
             flash('Please provide both start and end time for a partial blackout.', 'danger')
             return redirect(url_for('tutor.dashboard'))
         try:
-            start_time = dt.datetime.strptime(start_str, '%H:%M').time()
-            end_time = dt.datetime.strptime(end_str, '%H:%M').time()
+            start_time = _parse_clock(start_str)
+            end_time = _parse_clock(end_str)
         except ValueError:
             flash('Invalid time for blackout period.', 'danger')
             return redirect(url_for('tutor.dashboard'))
@@ -234,12 +341,27 @@ def add_exception():
             flash('Blackout end time must be after the start time.', 'danger')
             return redirect(url_for('tutor.dashboard'))
 
-    provisional_start = dt.datetime.combine(date_obj, start_time or dt.time.min)
-    provisional_end = dt.datetime.combine(date_obj, end_time or dt.time.max)
-    for existing in tutor.exceptions:
-        if existing.overlaps(provisional_start, provisional_end):
-            flash('That blackout overlaps with an existing one.', 'warning')
-            return redirect(url_for('tutor.dashboard'))
+    provisional_start = start_time or dt.time.min
+    provisional_end = end_time or dt.time.max
+    overlapping = (
+        db.session.query(TutorException.id)
+        .filter(
+            TutorException.tutor_id == tutor.id,
+            TutorException.date == date_obj,
+            or_(
+                TutorException.start_time.is_(None),
+                TutorException.end_time.is_(None),
+                and_(
+                    TutorException.start_time < provisional_end,
+                    TutorException.end_time > provisional_start,
+                ),
+            ),
+        )
+        .first()
+    )
+    if overlapping is not None:
+        flash('That blackout overlaps with an existing one.', 'warning')
+        return redirect(url_for('tutor.dashboard'))
 
     exception = TutorException(
         tutor_id=tutor.id,
@@ -263,19 +385,13 @@ def add_exception():
 @tutor_login_required
 def cancel_booking(booking_id: int):
     tutor = get_current_tutor()
-    if tutor is None:
-        flash('Please log in to access the tutor portal.', 'warning')
-        return redirect(url_for('tutor.login'))
-    booking = Booking.query.get_or_404(booking_id)
-    if booking.tutor_id != tutor.id:
-        flash("You cannot modify another tutor's booking.", 'danger')
-        return redirect(url_for('tutor.dashboard'))
+    booking = Booking.query.filter_by(id=booking_id, tutor_id=tutor.id).first_or_404()
     if booking.is_canceled:
         flash('That booking is already canceled.', 'info')
         return redirect(url_for('tutor.dashboard'))
     reason = request.form.get('cancel_reason', '').strip() or None
     booking.is_canceled = True
-    booking.canceled_at = dt.datetime.utcnow()
+    booking.canceled_at = _now()
     booking.cancel_reason = reason[:255] if reason else None
     db.session.commit()
     send_cancellation_notification(booking)
@@ -286,11 +402,8 @@ def cancel_booking(booking_id: int):
 @tutor_bp.route('/exceptions/<int:exception_id>/delete', methods=['POST'])
 @tutor_login_required
 def delete_exception(exception_id: int):
-    exception = TutorException.query.get_or_404(exception_id)
     tutor = get_current_tutor()
-    if exception.tutor_id != tutor.id:
-        flash('You cannot modify another tutor\'s exception.', 'danger')
-        return redirect(url_for('tutor.dashboard'))
+    exception = TutorException.query.filter_by(id=exception_id, tutor_id=tutor.id).first_or_404()
     db.session.delete(exception)
     db.session.commit()
     flash('Exception removed.', 'info')
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+PST = ZoneInfo('America/Los_Angeles')
+
+
+def pacific_now() -> dt.datetime:
+    return dt.datetime.now(PST)
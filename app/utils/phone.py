@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import re
+
+_NON_DIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+_NON_DIGIT_RE = re.compile(r'\D')
+
+
+def phone_digits(raw: str) -> str:
+    if raw.isascii():
+        return raw.translate(_NON_DIGITS)
+    return _NON_DIGIT_RE.sub('', raw)
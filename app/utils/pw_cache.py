@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from typing import Dict
+
+from flask import current_app
+from werkzeug.security import check_password_hash
+
+CACHE_TTL_SECONDS = 300
+CACHE_MAX_ENTRIES = 256
+
+# Per-process key so cached digests cannot be brute-forced back to short PINs offline.
+_DIGEST_KEY = secrets.token_bytes(32)
+# digest -> expiry (monotonic seconds); insertion order is expiry order since the TTL is fixed.
+_VERIFIED: Dict[bytes, float] = {}
+_LOCK = threading.Lock()
+
+
+def _digest(pw_hash: str, password: str) -> bytes:
+    return hmac.new(_DIGEST_KEY, f'{pw_hash}\0{password}'.encode(), hashlib.sha256).digest()
+
+
+def _drop_expired(now: float) -> None:
+    while _VERIFIED:
+        oldest = next(iter(_VERIFIED))
+        if _VERIFIED[oldest] > now and len(_VERIFIED) <= CACHE_MAX_ENTRIES:
+            break
+        del _VERIFIED[oldest]
+
+
+def verify_password(pw_hash: str, password: str) -> bool:
+    """check_password_hash, memoized per process when USE_VERIFY_PASSWORD_CACHE is on.
+
+    Only successful checks are remembered, keyed on an HMAC of the hash and PIN rather
+    than the PIN itself, and each entry is dropped CACHE_TTL_SECONDS after it was added.
+    """
+    if not current_app.config.get('USE_VERIFY_PASSWORD_CACHE'):
+        return check_password_hash(pw_hash, password)
+
+    key = _digest(pw_hash, password)
+    now = time.monotonic()
+    with _LOCK:
+        _drop_expired(now)
+        if key in _VERIFIED:
+            return True
+    if not check_password_hash(pw_hash, password):
+        return False
+    with _LOCK:
+        _VERIFIED.pop(key, None)
+        _VERIFIED[key] = now + CACHE_TTL_SECONDS
+        _drop_expired(now)
+    return True
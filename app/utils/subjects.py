@@ -1,21 +1,45 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+import re
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable, List, NamedTuple, Tuple
 
-from ..models import Subject
+from ..models import Subject, subjects_version
+
+
+class SubjectChoice(NamedTuple):
+    id: int
+    name: str
+    category: str
+
+
+_DIGITS_MATCH = re.compile(r'[0-9]+').fullmatch
+_CACHE: Tuple[int, List[Tuple[str, List[SubjectChoice]]]] | None = None
 
 
 def group_subjects(subjects: Iterable[Subject]) -> List[Tuple[str, List[Subject]]]:
-    grouped: List[Tuple[str, List[Subject]]] = []
-    current_category: str | None = None
-    bucket: List[Subject] = []
-    for subject in subjects:
-        if subject.category != current_category:
-            if bucket:
-                grouped.append((current_category or '', bucket))
-            current_category = subject.category
-            bucket = []
-        bucket.append(subject)
-    if bucket:
-        grouped.append((current_category or '', bucket))
-    return grouped
+    return [
+        (category or '', list(items))
+        for category, items in groupby(subjects, key=attrgetter('category'))
+    ]
+
+
+def get_grouped_subjects() -> List[Tuple[str, List[SubjectChoice]]]:
+    """Grouped subject choices for forms, cached per process until a Subject row changes.
+
+    Plain ``SubjectChoice`` tuples are cached rather than ORM rows so the result can
+    outlive the session that loaded it.
+    """
+    global _CACHE
+    version = subjects_version()
+    cached = _CACHE
+    if cached is None or cached[0] != version:
+        choices = [SubjectChoice(subject.id, subject.name, subject.category) for subject in Subject.ordered()]
+        cached = _CACHE = (version, group_subjects(choices))
+    return cached[1]
+
+
+def parse_subject_ids(values: Iterable[str]) -> List[int]:
+    # ASCII digits only: str.isdigit() accepts '²', which int() rejects, and \d matches any Unicode digit.
+    return [int(value) for value in values if _DIGITS_MATCH(value)]
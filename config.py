@@ -4,6 +4,17 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///peer_tutoring.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    RAISE_ON_LAZY_LOAD = os.environ.get('RAISE_ON_LAZY_LOAD', '0') == '1'
+    AUTO_SEED = os.environ.get('AUTO_SEED', '1') == '1'
+    # Tutor PINs are short, so the KDF mainly costs login latency; keep it moderate
+    # and rely on LOGIN_RATE_LIMIT to slow online guessing.
+    PIN_HASH_METHOD = os.environ.get('PIN_HASH_METHOD', 'pbkdf2:sha256:50000')
+    # Counters live in RATELIMIT_STORAGE_URI. The default memory:// store is per
+    # process, so each gunicorn worker allows the full limit; use a shared store
+    # such as redis://host:6379 (requires the redis package) to enforce it globally.
+    LOGIN_RATE_LIMIT = os.environ.get('LOGIN_RATE_LIMIT', '10 per minute')
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
+    USE_VERIFY_PASSWORD_CACHE = os.environ.get('USE_VERIFY_PASSWORD_CACHE', '0') == '1'
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
     BOOKING_SLOT_MINUTES = int(os.environ.get('BOOKING_SLOT_MINUTES', '30'))
     TEXTBELT_API_KEY = os.environ.get('TEXTBELT_API_KEY', '')